@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, UploadFile, Form
+from fastapi import FastAPI, HTTPException, UploadFile, Form, Response
 from fastapi.middleware.cors import CORSMiddleware
 import sys
 import os
@@ -7,6 +7,7 @@ from utils.store_embeddings import store_embeddings_in_pinecone
 from utils.query_rag import rag_query_run
 from utils.common import supabase
 from utils.pdf_reader import extract_text_pypdf2, extract_text_from_upload
+from utils.snapshot import export_session_snapshot_bytes, import_session_snapshot
 
 app = FastAPI(title="DocChat RAG API")
 
@@ -67,3 +68,40 @@ async def ask_query(session_id: str = Form(...), query: str = Form(...)):
 def get_history(session_id: str):
     data = supabase.table("user_queries").select("*").eq("session_id", session_id).execute()
     return {"session_id": session_id, "history": data.data}
+
+# --- 4️⃣ Export session snapshot ---
+@app.get("/export/{session_id}")
+def export_snapshot(session_id: str, compress: bool = False):
+    """
+    Downloads a session's vectors, chunk texts and metadata as a binary snapshot.
+    Note: scans every vector in the index (IDs carry no session prefix), so cost grows
+    with the whole index, and requires a serverless Pinecone index (uses index.list()).
+    """
+    data, count = export_session_snapshot_bytes(session_id, compress=compress)
+
+    if count == 0:
+        raise HTTPException(status_code=404, detail="No vectors found for this session")
+
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{session_id}.dcsnap"'}
+    )
+
+# --- 5️⃣ Import session snapshot ---
+@app.post("/import")
+async def import_snapshot(file: UploadFile, session_id: str = Form(...)):
+    """
+    Restores a snapshot into Pinecone under the given session, without re-embedding.
+    """
+    try:
+        vector_ids = import_session_snapshot(file.file.read(), session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid snapshot: {str(e)}")
+
+    return {
+        "status": "success",
+        "session_id": session_id,
+        "message": "Snapshot imported.",
+        "vectors_imported": len(vector_ids)
+    }
@@ -0,0 +1,284 @@
+# backend/utils/snapshot.py
+"""
+Session snapshots:
+Export a session's vectors + chunk metadata from Pinecone into a compact binary file,
+and import it back with bulk upserts (no Gemini embedding calls).
+
+File layout (little-endian):
+    [ 64-byte header ][ vectors block ][ metadata block ]
+
+    header   → magic, version, flags, dim, count, vectors block size, metadata block size
+    vectors  → count x dim float32, row-major (memory-mappable when not compressed)
+    metadata → UTF-8 JSON {"session_id": source session, "records": [[vector_id, doc_id, file_name, chunk_index, text], ...]}
+
+With FLAG_COMPRESSED both blocks are zlib-compressed independently.
+"""
+
+import argparse
+import json
+import struct
+import uuid
+import zlib
+from io import BytesIO
+
+import numpy as np
+
+from .common import index
+
+SNAPSHOT_MAGIC = b"DCSNAP\x00\x00"
+SNAPSHOT_VERSION = 1
+FLAG_COMPRESSED = 1
+
+HEADER_FORMAT = "<8sHHIIQQ"
+HEADER_SIZE = 64  # padded so the vectors block starts 64-byte aligned
+
+EXPORT_FETCH_BATCH = 100   # ids per fetch request
+IMPORT_UPSERT_BATCH = 100  # vectors per upsert request (stays under Pinecone's 2MB limit at 1536 dims)
+MAX_METADATA_BYTES = 256 * 1024 * 1024  # cap on decompressed metadata, guards against zlib bombs
+
+# Namespace for doc_ids remapped on cross-session import (deterministic, so retries overwrite)
+SNAPSHOT_DOC_NAMESPACE = uuid.UUID("6f1c4a52-3b7e-5d0a-9c2e-8a41d7e0b913")
+RECORD_TYPES = (str, str, str, int, str)  # vector_id, doc_id, file_name, chunk_index, text
+
+
+# ---------------------- FILE FORMAT -----------------------
+def write_snapshot(out, vectors, records, session_id, compress=False):
+    """
+    Write a snapshot to a binary file object.
+    vectors: (count, dim) float array, records: list of [vector_id, doc_id, file_name, chunk_index, text],
+    session_id: the session the vectors were exported from
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    if vectors.ndim != 2 or len(vectors) != len(records):
+        raise ValueError("vectors must be a (count, dim) array with one row per record")
+
+    count, dim = vectors.shape
+    vec_block = vectors.tobytes()
+    meta = {"session_id": session_id, "records": records}
+    meta_block = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    flags = 0
+    if compress:
+        flags |= FLAG_COMPRESSED
+        vec_block = zlib.compress(vec_block)
+        meta_block = zlib.compress(meta_block)
+
+    header = struct.pack(
+        HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags,
+        dim, count, len(vec_block), len(meta_block)
+    )
+    out.write(header.ljust(HEADER_SIZE, b"\x00"))
+    out.write(vec_block)
+    out.write(meta_block)
+
+
+def _parse_header(raw):
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("Not a DocChat snapshot: file too short")
+
+    magic, version, flags, dim, count, vec_nbytes, meta_nbytes = struct.unpack_from(HEADER_FORMAT, raw)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a DocChat snapshot: bad magic")
+    if not 1 <= version <= SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    if flags & ~FLAG_COMPRESSED:
+        raise ValueError(f"Unknown snapshot flags {flags:#x}")
+    if not flags & FLAG_COMPRESSED and vec_nbytes != count * dim * 4:
+        raise ValueError("Snapshot header is inconsistent: vectors block size does not match count x dim")
+
+    return flags, dim, count, vec_nbytes, meta_nbytes
+
+
+def _decompress(raw, max_length):
+    d = zlib.decompressobj()
+    try:
+        # max_length=0 means "unlimited" to zlib, so keep at least 1 (extra bytes fail the size check later)
+        data = d.decompress(raw, max(max_length, 1))
+    except zlib.error:
+        raise ValueError("Snapshot is corrupt")
+    if d.unconsumed_tail or not d.eof:
+        raise ValueError("Snapshot is corrupt: block is larger than declared or incomplete")
+    return data
+
+
+def _validate_records(records):
+    seen_ids = set()
+    for i, record in enumerate(records):
+        if not isinstance(record, list) or len(record) != len(RECORD_TYPES):
+            raise ValueError(f"Snapshot record {i} is malformed")
+        for value, expected in zip(record, RECORD_TYPES):
+            # bool is an int subclass, but never a valid chunk_index
+            if not isinstance(value, expected) or isinstance(value, bool):
+                raise ValueError(f"Snapshot record {i} has an invalid field: {value!r}")
+        if record[0] in seen_ids:
+            raise ValueError(f"Snapshot record {i} repeats vector ID {record[0]!r}")
+        seen_ids.add(record[0])
+
+
+def read_snapshot(source):
+    """
+    Read a snapshot from a file path or raw bytes.
+    Returns (vectors, records, session_id). Uncompressed files on disk are memory-mapped, not loaded.
+    Raises ValueError for anything malformed, before the caller sees any data.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        buf = memoryview(source)
+        flags, dim, count, vec_nbytes, meta_nbytes = _parse_header(bytes(buf[:HEADER_SIZE]))
+        vec_raw = buf[HEADER_SIZE:HEADER_SIZE + vec_nbytes]
+        meta_raw = bytes(buf[HEADER_SIZE + vec_nbytes:HEADER_SIZE + vec_nbytes + meta_nbytes])
+        mmap_path = None
+    else:
+        with open(source, "rb") as f:
+            flags, dim, count, vec_nbytes, meta_nbytes = _parse_header(f.read(HEADER_SIZE))
+            # compressed vectors must be read in full; uncompressed ones are mapped below
+            vec_raw = f.read(vec_nbytes) if flags & FLAG_COMPRESSED else None
+            f.seek(HEADER_SIZE + vec_nbytes)
+            meta_raw = f.read(meta_nbytes)
+        mmap_path = source
+
+    if len(meta_raw) != meta_nbytes:
+        raise ValueError("Snapshot is truncated")
+
+    if flags & FLAG_COMPRESSED:
+        vectors = np.frombuffer(_decompress(vec_raw, count * dim * 4), dtype="<f4")
+        meta_raw = _decompress(meta_raw, MAX_METADATA_BYTES)
+    elif mmap_path is not None and count * dim:
+        vectors = np.memmap(mmap_path, dtype="<f4", mode="r", offset=HEADER_SIZE, shape=(count * dim,))
+    else:
+        vectors = np.frombuffer(vec_raw or b"", dtype="<f4")
+
+    if vectors.size != count * dim:
+        raise ValueError("Snapshot is truncated")
+
+    # UnicodeDecodeError / JSONDecodeError are ValueErrors already
+    meta = json.loads(meta_raw.decode("utf-8"))
+    if (not isinstance(meta, dict) or not isinstance(meta.get("records"), list)
+            or not isinstance(meta.get("session_id"), str)):
+        raise ValueError("Snapshot metadata is malformed")
+
+    records = meta["records"]
+    if len(records) != count:
+        raise ValueError("Snapshot metadata does not match vector count")
+
+    # Validate everything up front, so a bad file never leaves a session half-imported
+    _validate_records(records)
+
+    return vectors.reshape(count, dim), records, meta.get("session_id")
+
+
+# ---------------------- EXPORT -----------------------
+def _iter_session_vectors(session_id):
+    # IDs carry no session prefix, so this lists and fetches every vector in the index
+    # (cost grows with the whole index) — index.list() needs a serverless index.
+    for id_page in index.list():
+        ids = list(id_page)
+        for start in range(0, len(ids), EXPORT_FETCH_BATCH):
+            fetched = index.fetch(ids=ids[start:start + EXPORT_FETCH_BATCH])
+            for vector_id, vec in fetched.vectors.items():
+                meta = vec.metadata or {}
+                if meta.get("session_id") == session_id:
+                    yield vector_id, vec.values, meta
+
+
+def export_session_snapshot(session_id, out, compress=False):
+    """Dump every vector of a session from Pinecone into a snapshot file object."""
+    rows, records = [], []
+    for vector_id, values, meta in _iter_session_vectors(session_id):
+        rows.append(values)
+        records.append([
+            vector_id,
+            # Pinecone rejects null metadata, so missing fields become "" / 0
+            meta.get("doc_id") or "",
+            meta.get("file_name") or "",
+            int(meta.get("chunk_index") or 0),
+            meta.get("text") or "",
+        ])
+
+    # Keep documents together and chunks in order, so snapshots are deterministic
+    order = sorted(range(len(records)), key=lambda i: (records[i][1], records[i][3]))
+    records = [records[i] for i in order]
+    vectors = np.asarray([rows[i] for i in order], dtype="<f4")
+    if not records:
+        vectors = vectors.reshape(0, 0)
+
+    write_snapshot(out, vectors, records, session_id, compress=compress)
+    print(f"Exported {len(records)} vectors for session → {session_id}")
+    return len(records)
+
+
+def export_session_snapshot_bytes(session_id, compress=False):
+    buf = BytesIO()
+    count = export_session_snapshot(session_id, buf, compress=compress)
+    return buf.getvalue(), count
+
+
+# ---------------------- IMPORT -----------------------
+def import_session_snapshot(source, session_id):
+    """
+    Bulk-load a snapshot into Pinecone under `session_id`.
+    Vectors are upserted as stored — no embedding calls are made.
+    Into the snapshot's own session the vector IDs are kept. Into any other session each document
+    gets a new doc_id derived from (target session, source session, doc_id), so the source session
+    is never overwritten. Either way re-importing the same file overwrites instead of duplicating.
+    Returns the list of upserted vector IDs.
+    """
+    vectors, records, source_session_id = read_snapshot(source)
+
+    if session_id != source_session_id:
+        positions = {}
+        remapped = []
+        for vector_id, doc_id, file_name, chunk_index, text in records:
+            new_doc_id = str(uuid.uuid5(SNAPSHOT_DOC_NAMESPACE, f"{session_id}:{source_session_id}:{doc_id}"))
+            # suffix is the row's position within its doc, not chunk_index — missing chunk_index
+            # values were exported as 0 and would otherwise collide
+            position = positions.get(new_doc_id, 0)
+            positions[new_doc_id] = position + 1
+            remapped.append([f"{new_doc_id}-{position}", new_doc_id, file_name, chunk_index, text])
+        records = remapped
+
+    for start in range(0, len(records), IMPORT_UPSERT_BATCH):
+        batch = []
+        for row, (vector_id, doc_id, file_name, chunk_index, text) in zip(
+            vectors[start:start + IMPORT_UPSERT_BATCH], records[start:start + IMPORT_UPSERT_BATCH]
+        ):
+            batch.append((
+                vector_id,
+                row.tolist(),
+                {
+                    "text": text,
+                    "session_id": session_id,
+                    "doc_id": doc_id,
+                    "file_name": file_name,
+                    "chunk_index": chunk_index,
+                }
+            ))
+        index.upsert(vectors=batch)
+
+    print(f"Imported {len(records)} vectors for session → {session_id}")
+    return [record[0] for record in records]
+
+
+# ---------------------- CLI -----------------------
+# Run from backend/:
+#   python -m utils.snapshot export <session_id> <file> [--compress]
+#   python -m utils.snapshot import <file> <session_id>
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export / import DocChat session snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export")
+    exp.add_argument("session_id")
+    exp.add_argument("path")
+    exp.add_argument("--compress", action="store_true")
+
+    imp = sub.add_parser("import")
+    imp.add_argument("path")
+    imp.add_argument("session_id")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        with open(args.path, "wb") as f:
+            export_session_snapshot(args.session_id, f, compress=args.compress)
+    else:
+        import_session_snapshot(args.path, args.session_id)
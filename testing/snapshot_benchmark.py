@@ -0,0 +1,104 @@
+# Compare restoring a session from a snapshot against full re-ingestion (extract → chunk → embed → upsert)
+#
+# Side effects: calls Gemini for every chunk (uses embedding quota) and writes vectors to the real
+# Pinecone index under the bench_* sessions — these are deleted again at the end.
+# Supabase usage/upload logging is stubbed out so runs don't pollute production analytics
+# (which makes the re-ingestion timing slightly optimistic).
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from utils import store_embeddings
+from utils.common import index
+from utils.pdf_reader import extract_text_pypdf2
+from utils.store_embeddings import chunk_text, store_embeddings_in_pinecone
+from utils.snapshot import export_session_snapshot, import_session_snapshot, _iter_session_vectors
+
+PDF_PATH = os.path.join(os.path.dirname(__file__), '..', 'backend', 'utils', 'Quantization.pdf')
+INGEST_SESSION = "bench_reingest"
+RESTORE_SESSION = "bench_restore"
+CONSISTENCY_TIMEOUT = 120  # seconds to wait for Pinecone to list every ingested chunk
+
+
+class NoOpSupabase:
+    def rpc(self, *args, **kwargs):
+        return self
+
+    def table(self, *args, **kwargs):
+        return self
+
+    def insert(self, *args, **kwargs):
+        return self
+
+    def execute(self):
+        return None
+
+
+store_embeddings.supabase = NoOpSupabase()
+
+# Track every vector ID this script writes, so cleanup doesn't depend on index.list()
+# (which is eventually consistent and can miss just-upserted vectors)
+written_ids = []
+ingest_doc_ids = []
+_generate_unique_uuid = store_embeddings.generate_unique_uuid
+
+
+def tracking_uuid():
+    doc_id = _generate_unique_uuid()
+    ingest_doc_ids.append(doc_id)
+    return doc_id
+
+
+store_embeddings.generate_unique_uuid = tracking_uuid
+
+try:
+    # --- Full re-ingestion ---
+    start = time.perf_counter()
+    text = extract_text_pypdf2(PDF_PATH)
+    store_embeddings_in_pinecone(text, INGEST_SESSION, os.path.basename(PDF_PATH), num_pages=0, uploaded_by="benchmark")
+    reingest_time = time.perf_counter() - start
+
+    expected = len(chunk_text(text))
+
+    # Pinecone is eventually consistent — wait until every chunk is visible before exporting
+    deadline = time.time() + CONSISTENCY_TIMEOUT
+    while sum(1 for _ in _iter_session_vectors(INGEST_SESSION)) < expected:
+        if time.time() > deadline:
+            raise RuntimeError(f"Pinecone did not list all {expected} chunks within {CONSISTENCY_TIMEOUT}s")
+        time.sleep(2)
+
+    for compress in (False, True):
+        snapshot_path = os.path.join(tempfile.gettempdir(), f"bench_snapshot_{int(compress)}.dcsnap")
+
+        start = time.perf_counter()
+        with open(snapshot_path, "wb") as f:
+            count = export_session_snapshot(INGEST_SESSION, f, compress=compress)
+        export_time = time.perf_counter() - start
+
+        # A partial export would make the restore look faster than it really is
+        assert count == expected, f"Exported {count} vectors, expected {expected}"
+
+        # --- Restore from snapshot (no embedding calls, new IDs since the session differs) ---
+        start = time.perf_counter()
+        written_ids += import_session_snapshot(snapshot_path, RESTORE_SESSION)
+        restore_time = time.perf_counter() - start
+
+        print(f"\ncompress={compress}")
+        print("Vectors:            ", count)
+        print("Snapshot size (KB): ", round(os.path.getsize(snapshot_path) / 1024, 1))
+        print("Re-ingestion (s):   ", round(reingest_time, 2))
+        print("Export (s):         ", round(export_time, 2))
+        print("Restore (s):        ", round(restore_time, 2))
+        print("Speedup:            ", f"{reingest_time / restore_time:.1f}x")
+
+finally:
+    # --- Clean up benchmark vectors ---
+    # ingestion writes f"{doc_id}-{i}" per chunk; a recorded doc_id means `text` was already extracted
+    for doc_id in ingest_doc_ids:
+        written_ids += [f"{doc_id}-{i}" for i in range(len(chunk_text(text)))]
+    ids = sorted(set(written_ids))
+    for start in range(0, len(ids), 1000):
+        index.delete(ids=ids[start:start + 1000])
+    print(f"Deleted {len(ids)} benchmark vectors")
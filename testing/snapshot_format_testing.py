@@ -0,0 +1,158 @@
+# Offline checks for the session snapshot format — no Pinecone / Supabase / Gemini needed
+import os
+import sys
+import types
+import struct
+import tempfile
+from io import BytesIO
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+
+# --- Stub utils.common so importing the snapshot module doesn't connect to anything ---
+class FakeIndex:
+    def __init__(self):
+        self.upserted = []
+
+    def upsert(self, vectors):
+        self.upserted.extend(vectors)
+
+
+common_stub = types.ModuleType("utils.common")
+common_stub.index = FakeIndex()
+sys.modules["utils.common"] = common_stub
+
+from utils import snapshot  # noqa: E402
+
+
+def make_snapshot(vectors, records, session_id="session_1", compress=False):
+    buf = BytesIO()
+    snapshot.write_snapshot(buf, vectors, records, session_id, compress=compress)
+    return buf.getvalue()
+
+
+def expect_value_error(source, label):
+    try:
+        snapshot.read_snapshot(source)
+    except ValueError as e:
+        print(f"✅ {label}: {e}")
+    else:
+        raise AssertionError(f"{label}: expected ValueError")
+
+
+vectors = np.random.rand(5, 8).astype("f4")
+records = [[f"doc-{i}", "doc", "notes.pdf", i, f"chunk {i} — ünïcode"] for i in range(5)]
+tmp_dir = tempfile.mkdtemp()
+
+# --- Round trips: bytes and file input, compressed and not ---
+for compress in (False, True):
+    data = make_snapshot(vectors, records, compress=compress)
+    path = os.path.join(tmp_dir, f"snap_{int(compress)}.dcsnap")
+    with open(path, "wb") as f:
+        f.write(data)
+
+    for source in (data, path):
+        got_vectors, got_records, got_session = snapshot.read_snapshot(source)
+        assert np.array_equal(got_vectors, vectors)
+        assert got_records == records
+        assert got_session == "session_1"
+
+    mapped, _, _ = snapshot.read_snapshot(path)
+    assert isinstance(mapped, np.memmap) != compress
+    print(f"✅ Round trip OK (compress={compress}, memmap={isinstance(mapped, np.memmap)})")
+
+# --- Empty snapshot ---
+empty = make_snapshot(np.zeros((0, 0), dtype="f4"), [])
+empty_path = os.path.join(tmp_dir, "empty.dcsnap")
+with open(empty_path, "wb") as f:
+    f.write(empty)
+for source in (empty, empty_path):
+    got_vectors, got_records, _ = snapshot.read_snapshot(source)
+    assert got_vectors.shape == (0, 0) and got_records == []
+print("✅ Empty snapshot OK")
+
+# --- Rejected inputs ---
+good = make_snapshot(vectors, records)
+good_compressed = make_snapshot(vectors, records, compress=True)
+
+
+def patch_header(data, **fields):
+    magic, version, flags, dim, count, vec_nbytes, meta_nbytes = struct.unpack_from(snapshot.HEADER_FORMAT, data)
+    values = dict(magic=magic, version=version, flags=flags, dim=dim, count=count,
+                  vec_nbytes=vec_nbytes, meta_nbytes=meta_nbytes)
+    values.update(fields)
+    header = struct.pack(snapshot.HEADER_FORMAT, *values.values()).ljust(snapshot.HEADER_SIZE, b"\x00")
+    return header + data[snapshot.HEADER_SIZE:]
+
+
+truncated_path = os.path.join(tmp_dir, "truncated.dcsnap")
+with open(truncated_path, "wb") as f:
+    f.write(good[:-10])
+
+corrupt = bytearray(good_compressed)
+corrupt[snapshot.HEADER_SIZE:snapshot.HEADER_SIZE + 8] = b"\xff" * 8
+
+expect_value_error(b"short", "Too short")
+expect_value_error(b"NOTASNAP" + good[8:], "Bad magic")
+expect_value_error(good[:-10], "Truncated bytes")
+expect_value_error(truncated_path, "Truncated file")
+expect_value_error(bytes(corrupt), "Corrupt compressed data")
+expect_value_error(patch_header(good, version=0), "Version 0")
+expect_value_error(patch_header(good, version=snapshot.SNAPSHOT_VERSION + 1), "Future version")
+expect_value_error(patch_header(good, flags=2), "Unknown flags")
+expect_value_error(patch_header(good, dim=7), "Vectors block size mismatch")
+
+# compressed block that inflates past count x dim (declared dim is half the real one)
+big = make_snapshot(np.zeros((5, 16), dtype="f4"), records, compress=True)
+expect_value_error(patch_header(big, dim=8), "Oversized compressed block")
+
+# --- Malformed records: rejected before anything is upserted ---
+bad_records = {
+    "Record not a list": lambda rs: rs[:-1] + [7],
+    "Record too short": lambda rs: rs[:-1] + [["a", "d", "f", 0]],
+    "Null chunk_index": lambda rs: rs[:-1] + [["a", "d", "f", None, "t"]],
+    "Bool chunk_index": lambda rs: rs[:-1] + [["a", "d", "f", True, "t"]],
+    "Null doc_id": lambda rs: rs[:-1] + [["a", None, "f", 0, "t"]],
+    "Duplicate vector ID": lambda rs: rs[:-1] + [rs[0]],
+}
+many_vectors = np.random.rand(151, 8).astype("f4")
+many_records = [[f"doc-{i}", "doc", "notes.pdf", i, "text"] for i in range(151)]
+for label, corrupt_records in bad_records.items():
+    bad = make_snapshot(many_vectors, corrupt_records(many_records))
+    common_stub.index.upserted = []
+    try:
+        snapshot.import_session_snapshot(bad, "session_2")
+    except ValueError as e:
+        print(f"✅ {label}: {e}")
+    else:
+        raise AssertionError(f"{label}: expected ValueError")
+    assert common_stub.index.upserted == [], f"{label}: vectors were upserted before failing"
+
+# --- Import: same session keeps IDs, another session gets new (deterministic) ones ---
+index = common_stub.index
+
+snapshot.import_session_snapshot(good, "session_1")
+assert [v[0] for v in index.upserted] == [r[0] for r in records]
+assert all(v[2]["session_id"] == "session_1" for v in index.upserted)
+
+index.upserted = []
+snapshot.import_session_snapshot(good, "session_2")
+new_ids = [v[0] for v in index.upserted]
+assert not set(new_ids) & {r[0] for r in records}
+assert len({v[2]["doc_id"] for v in index.upserted}) == 1
+assert all(v[2]["session_id"] == "session_2" for v in index.upserted)
+
+# re-importing into the other session reuses the same IDs, so a retry overwrites instead of duplicating
+index.upserted = []
+returned_ids = snapshot.import_session_snapshot(good, "session_2")
+assert [v[0] for v in index.upserted] == new_ids == returned_ids
+
+index.upserted = []
+# missing doc_id / chunk_index were exported as "" / 0 — their new IDs must still be unique
+no_doc_records = [[f"doc_chunk{i}", "", "", 0, "text"] for i in range(3)]
+snapshot.import_session_snapshot(make_snapshot(vectors[:3], no_doc_records), "session_2")
+assert len({v[0] for v in index.upserted}) == 3
+assert all(None not in v[2].values() for v in index.upserted)
+print("✅ Import ID handling OK")